@@ -73,8 +73,22 @@ REST_FRAMEWORK = {
     ],
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 10,
+    'DEFAULT_THROTTLE_CLASSES': [
+        'jobs.throttling.TokenBucketThrottle',
+    ],
+    'DEFAULT_THROTTLE_RATES': {
+        'anon': '30/min',
+        'applicant': '120/min',
+        'company': '120/min',
+        'applicant.job.list': '60/min',
+        'applicant.application.create': '10/min',
+    },
+    # Anonymous clients are keyed by REMOTE_ADDR unless the deployment sits behind that many proxies.
+    'NUM_PROXIES': config('NUM_PROXIES', default=0, cast=int),
 }
 
+THROTTLE_STORE_PATH = config('THROTTLE_STORE_PATH', default=str(BASE_DIR / 'throttle.sqlite3'))
+
 cloudinary.config(
     cloud_name=config('CLOUDINARY_CLOUD_NAME'),
     api_key=config('CLOUDINARY_API_KEY'),
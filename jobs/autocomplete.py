@@ -0,0 +1,284 @@
+import heapq
+import logging
+import threading
+import time
+from bisect import bisect_left, insort
+from datetime import timedelta
+from django.db import connection, transaction
+from django.db.models import Count, Max
+from django.utils import timezone
+from .models import Job, JobIndexChange
+
+logger = logging.getLogger(__name__)
+
+MAX_CHAR = '\U0010ffff'
+
+
+def display(value):
+    return ' '.join((value or '').split())
+
+
+def normalize(value):
+    return display(value).casefold()
+
+
+def current_version():
+    """Row count and newest updated_at of the Job table, shared by every index."""
+    version = Job.objects.aggregate(count=Count('pk'), latest=Max('updated_at'))
+    return version['count'], version['latest']
+
+
+class PrefixIndex:
+    """
+    In-memory sorted-array prefix index over one Job field, weighted by posting count.
+
+    Every prefix matching more than `max_scan` keys keeps a cached top list. The lists are built
+    bottom-up from their children when the index is compiled and patched in place on writes, so a
+    lookup never rescans a wide range.
+    """
+    max_scan = 250
+    cache_depth = 40
+    max_limit = 20
+
+    def __init__(self, field):
+        self.field = field
+        self._keys = []
+        self._entries = {}
+        self._wide_cache = {}
+        self._lock = threading.Lock()
+
+    def _rank(self, key):
+        return (-self._entries[key][0], key)
+
+    @staticmethod
+    def count(entries, value):
+        key = normalize(value)
+        if key:
+            entries.setdefault(key, [0, display(value)])[0] += 1
+
+    def compile(self, entries):
+        keys = sorted(entries)
+        cache = {}
+        if keys:
+            self._top(keys, entries, cache, '', 0, len(keys))
+        return keys, entries, cache
+
+    def load(self, compiled):
+        with self._lock:
+            self._keys, self._entries, self._wide_cache = compiled
+
+    def _top(self, keys, entries, cache, prefix, lo, hi):
+        """Return (top keys, complete) for keys[lo:hi], caching wide prefixes from their children's lists."""
+        rank = lambda key: (-entries[key][0], key)
+        if prefix in cache:
+            return cache[prefix], len(cache[prefix]) >= hi - lo
+        if hi - lo <= self.max_scan:
+            top = heapq.nsmallest(self.cache_depth, keys[lo:hi], key=rank)
+            return top, len(top) == hi - lo
+        candidates, bound = [], None
+        i = lo
+        if keys[i] == prefix:
+            candidates.append(prefix)
+            i += 1
+        while i < hi:
+            child = keys[i][:len(prefix) + 1]
+            j = bisect_left(keys, child + MAX_CHAR, i, hi)
+            child_top, complete = self._top(keys, entries, cache, child, i, j)
+            candidates.extend(child_top)
+            if not complete:
+                bound = rank(child_top[-1]) if bound is None else min(bound, rank(child_top[-1]))
+            i = j
+        # Past the weakest key of a truncated child list, that child may hide better keys.
+        top = [key for key in heapq.nsmallest(self.cache_depth, candidates, key=rank) if bound is None or rank(key) <= bound]
+        cache[prefix] = top
+        return top, False
+
+    def _range(self, prefix):
+        lo = bisect_left(self._keys, prefix)
+        return lo, bisect_left(self._keys, prefix + MAX_CHAR, lo)
+
+    def apply(self, value, delta):
+        key = normalize(value)
+        if not key:
+            return
+        with self._lock:
+            entry = self._entries.get(key)
+            if delta > 0 and entry is None:
+                self._entries[key] = [1, display(value)]
+                insort(self._keys, key)
+            elif delta > 0:
+                entry[0] += 1
+            elif entry is None:
+                return
+            elif entry[0] > 1:
+                entry[0] -= 1
+            else:
+                del self._entries[key]
+                del self._keys[bisect_left(self._keys, key)]
+            self._patch_caches(key, added=delta > 0)
+
+    def _patch_caches(self, key, added):
+        # Longest prefix first, so a parent that needs a refill merges already patched children.
+        for end in range(len(key), -1, -1):
+            prefix = key[:end]
+            cached = self._wide_cache.get(prefix)
+            if cached is None:
+                continue
+            listed = key in cached
+            if listed:
+                cached.remove(key)
+            elif not added:
+                continue
+            if key in self._entries and ((added and listed) or (cached and self._rank(key) < self._rank(cached[-1]))):
+                cached.append(key)
+                cached.sort(key=self._rank)
+                del cached[self.cache_depth:]
+            if len(cached) < self.max_limit:
+                self._refill(prefix)
+
+    def _refill(self, prefix):
+        del self._wide_cache[prefix]
+        lo, hi = self._range(prefix)
+        if hi - lo > self.max_scan:
+            self._top(self._keys, self._entries, self._wide_cache, prefix, lo, hi)
+
+    def suggest(self, prefix, limit=10):
+        prefix = normalize(prefix)
+        limit = min(limit, self.max_limit)
+        with self._lock:
+            top = self._wide_cache.get(prefix)
+            if top is None:
+                lo, hi = self._range(prefix)
+                if hi - lo > self.max_scan:
+                    top, _ = self._top(self._keys, self._entries, self._wide_cache, prefix, lo, hi)
+                else:
+                    top = heapq.nsmallest(limit, self._keys[lo:hi], key=self._rank)
+            return [{'value': self._entries[key][1], 'count': self._entries[key][0]} for key in top[:limit]]
+
+
+class AutocompleteIndexes:
+    """
+    The per-process prefix indexes, kept in step with the JobIndexChange log.
+
+    Every Job write appends a change row in its own transaction. Each worker replays rows it has not
+    applied yet in primary-key order: right after its own commits, and from a background thread at
+    most every `sync_interval` seconds for writes made elsewhere. Rows from the last `gap_window` ids
+    are re-read so a transaction that committed out of id order is not skipped. A full rebuild only
+    happens on first use, after a worker missed more than `retention` of the log, or when the table's
+    count or newest updated_at no longer matches what the log explains (bulk_create, raw SQL, ...).
+    Writes that bypass both signals and updated_at, such as a bare queryset.update(), are not detected.
+    """
+    sync_interval = 5
+    drift_interval = 600
+    gap_window = 100
+    retention = timedelta(hours=1)
+
+    def __init__(self, fields):
+        self.fields = tuple(fields)
+        self._indexes = {field: PrefixIndex(field) for field in self.fields}
+        self._maintenance_lock = threading.Lock()
+        self._sync_lock = threading.Lock()
+        self.reset()
+
+    def __contains__(self, field):
+        return field in self._indexes
+
+    def __getitem__(self, field):
+        return self._indexes[field]
+
+    def reset(self):
+        with self._sync_lock:
+            for index in self._indexes.values():
+                index.load(([], {}, {}))
+            self._loaded = False
+            self._cursor = self._floor = 0
+            self._applied = set()
+            self._expected = (0, None)
+            self._synced_at = 0
+            self._next_sync = self._next_drift_check = 0
+
+    def suggest(self, field, prefix, limit=10):
+        """Return suggestions, or nothing while the index warms up in the background."""
+        now = time.monotonic()
+        if (not self._loaded or now >= self._next_sync) and self._maintenance_lock.acquire(blocking=False):
+            self._next_sync = now + self.sync_interval
+            threading.Thread(target=self._maintain, daemon=True).start()
+        if not self._loaded:
+            return []
+        return self._indexes[field].suggest(prefix, limit)
+
+    def _maintain(self):
+        try:
+            if not self._loaded or time.monotonic() - self._synced_at > self.retention.total_seconds() / 2:
+                self._rebuild()
+            self.sync()
+            if time.monotonic() >= self._next_drift_check:
+                self._next_drift_check = time.monotonic() + self.drift_interval
+                self._check_drift()
+        except Exception:
+            logger.exception('Maintaining the autocomplete indexes failed')
+        finally:
+            connection.close()
+            self._maintenance_lock.release()
+
+    def rebuild(self):
+        with self._maintenance_lock:
+            self._rebuild()
+
+    def _rebuild(self):
+        entries = {field: {} for field in self.fields}
+        with transaction.atomic():
+            cursor = JobIndexChange.objects.aggregate(last=Max('pk'))['last'] or 0
+            version = current_version()
+            for row in Job.objects.values_list(*self.fields).iterator(chunk_size=10000):
+                for field, value in zip(self.fields, row):
+                    PrefixIndex.count(entries[field], value)
+        compiled = {field: self._indexes[field].compile(entries[field]) for field in self.fields}
+        with self._sync_lock:
+            for field, index in self._indexes.items():
+                index.load(compiled[field])
+            self._cursor = self._floor = cursor
+            self._applied = set()
+            self._expected = version
+            self._synced_at = time.monotonic()
+            self._next_sync = self._synced_at + self.sync_interval
+            self._loaded = True
+
+    def sync(self, lookback=True):
+        """Apply logged changes this process has not seen; `lookback` re-reads the gap window as well."""
+        if not self._loaded:
+            return
+        with self._sync_lock:
+            start = self._floor if lookback else self._cursor
+            for change in JobIndexChange.objects.filter(pk__gt=start).order_by('pk'):
+                if change.pk in self._applied:
+                    continue
+                self._applied.add(change.pk)
+                self._cursor = max(self._cursor, change.pk)
+                count, latest = self._expected
+                if change.updated_at and (latest is None or change.updated_at > latest):
+                    latest = change.updated_at
+                self._expected = (count + change.job_delta, latest)
+                for field, (old, new) in change.values.items():
+                    if field in self._indexes:
+                        self._indexes[field].apply(old, -1)
+                        self._indexes[field].apply(new, 1)
+            if lookback:
+                self._floor = max(self._floor, self._cursor - self.gap_window)
+                self._applied = {pk for pk in self._applied if pk > self._floor}
+                self._synced_at = time.monotonic()
+
+    def _check_drift(self):
+        JobIndexChange.objects.filter(created_at__lt=timezone.now() - self.retention).delete()
+        # A write committing between the sync and the version read looks like drift once; check twice.
+        for _ in range(2):
+            count, latest = current_version()
+            expected_count, expected_latest = self._expected
+            if count == expected_count and (latest is None or (expected_latest is not None and latest <= expected_latest)):
+                return
+            self.sync()
+        logger.info('Autocomplete indexes drifted from the Job table, rebuilding')
+        self._rebuild()
+
+
+indexes = AutocompleteIndexes(('title', 'location'))
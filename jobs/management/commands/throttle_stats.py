@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+from jobs.throttling import get_store
+
+
+class Command(BaseCommand):
+    help = 'Show throttle hits per scope recorded by all worker processes.'
+
+    def handle(self, *args, **options):
+        totals = get_store().hit_totals()
+        if not totals:
+            self.stdout.write('No throttled requests recorded.')
+        for scope, total in totals.items():
+            self.stdout.write(f'{scope}\t{total}')
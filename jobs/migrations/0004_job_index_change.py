@@ -0,0 +1,28 @@
+# Generated by Django 4.2 on 2026-10-19 09:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0003_job_updated_at'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='JobIndexChange',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('job_delta', models.SmallIntegerField(default=0)),
+                ('values', models.JSONField()),
+                ('updated_at', models.DateTimeField(null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True, db_index=True)),
+            ],
+        ),
+        migrations.AlterField(
+            model_name='job',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, db_index=True),
+        ),
+    ]
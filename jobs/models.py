@@ -44,6 +44,13 @@ class Job(models.Model):
     location = models.CharField(max_length=255, blank=True)
     created_by = models.ForeignKey(User, on_delete=models.CASCADE, related_name='jobs')
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_values = dict(zip(field_names, values))
+        return instance
 
     def __str__(self):
         return self.title
@@ -51,6 +58,13 @@ class Job(models.Model):
     class Meta:
         ordering = ['-created_at']
 
+class JobIndexChange(models.Model):
+    """Committed change to an indexed Job field, replayed in order by every worker's autocomplete index."""
+    job_delta = models.SmallIntegerField(default=0)
+    values = models.JSONField()
+    updated_at = models.DateTimeField(null=True)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
 class Application(models.Model):
     STATUS_CHOICES = (
         ('Applied', 'Applied'),
@@ -0,0 +1,42 @@
+from django.db import transaction
+from django.db.models.signals import pre_save, post_save, post_delete
+from django.dispatch import receiver
+from .models import Job, JobIndexChange
+from .autocomplete import indexes
+
+
+def log_change(job_delta, values, updated_at):
+    # The row commits or rolls back with the Job write; this worker replays it right after commit.
+    JobIndexChange.objects.create(job_delta=job_delta, values=values, updated_at=updated_at)
+    transaction.on_commit(lambda: indexes.sync(lookback=False))
+
+
+@receiver(pre_save, sender=Job)
+def remember_indexed_values(sender, instance, **kwargs):
+    loaded = getattr(instance, '_loaded_values', {})
+    if instance._state.adding:
+        previous = None
+    elif all(field in loaded for field in indexes.fields):
+        previous = {field: loaded[field] for field in indexes.fields}
+    else:
+        previous = Job.objects.filter(pk=instance.pk).values(*indexes.fields).first()
+    instance._autocomplete_previous = previous
+
+
+@receiver(post_save, sender=Job)
+def log_indexed_values(sender, instance, created, **kwargs):
+    previous = getattr(instance, '_autocomplete_previous', None)
+    current = {field: getattr(instance, field) for field in indexes.fields}
+    instance._loaded_values = {**getattr(instance, '_loaded_values', {}), **current}
+    values = {
+        field: [previous[field] if previous else None, value]
+        for field, value in current.items()
+        if not previous or previous[field] != value
+    }
+    # Saves that leave both fields alone are still logged so the drift check can account for updated_at.
+    log_change(1 if created else 0, values, instance.updated_at)
+
+
+@receiver(post_delete, sender=Job)
+def log_deleted_values(sender, instance, **kwargs):
+    log_change(-1, {field: [getattr(instance, field), None] for field in indexes.fields}, None)
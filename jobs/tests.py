@@ -0,0 +1,304 @@
+import io
+import os
+import tempfile
+import time
+import uuid
+from unittest import mock
+from django.conf import settings
+from django.core.management import call_command
+from django.db import transaction
+from django.test import override_settings
+from rest_framework.test import APITestCase
+from .models import User, Job, Application
+from .autocomplete import AutocompleteIndexes, PrefixIndex, indexes
+from .throttling import SharedBucketStore, TokenBucketThrottle
+from .views import JobViewSet
+
+
+class JobPlatformTestCase(APITestCase):
+    """Keeps every test's throttle buckets in a throwaway store instead of the real THROTTLE_STORE_PATH."""
+
+    @classmethod
+    def setUpClass(cls):
+        directory = tempfile.TemporaryDirectory()
+        cls.addClassCleanup(directory.cleanup)
+        override = override_settings(THROTTLE_STORE_PATH=os.path.join(directory.name, 'throttle.sqlite3'))
+        override.enable()
+        cls.addClassCleanup(override.disable)
+        cls.addClassCleanup(TokenBucketThrottle.hits.clear)
+        super().setUpClass()
+
+
+class MultiGetTests(JobPlatformTestCase):
+    def setUp(self):
+        self.company = User.objects.create_user('company@example.com', 'Company', 'Passw0rd!', role='company')
+        self.applicant = User.objects.create_user('applicant@example.com', 'Applicant', 'Passw0rd!')
+        self.jobs = [
+            Job.objects.create(title=f'Job {i}', description='A job description long enough.', created_by=self.company)
+            for i in range(3)
+        ]
+        self.client.force_authenticate(self.company)
+
+    def test_jobs_keep_requested_order_and_report_missing_ids(self):
+        missing = uuid.uuid4()
+        response = self.client.get('/api/jobs/', {'ids': f'{self.jobs[2].id},{missing},{self.jobs[0].id}'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([job['title'] for job in response.data['object']], ['Job 2', 'Job 0'])
+        self.assertEqual(response.data['missingIds'], [str(missing)])
+
+    def test_applications_are_scoped_to_the_applicant(self):
+        application = Application.objects.create(applicant=self.applicant, job=self.jobs[0], resume_link='https://example.com/cv.pdf')
+        other = User.objects.create_user('other@example.com', 'Other', 'Passw0rd!')
+        foreign = Application.objects.create(applicant=other, job=self.jobs[0], resume_link='https://example.com/cv.pdf')
+        self.client.force_authenticate(self.applicant)
+        response = self.client.get('/api/applications/', {'ids': f'{application.id},{foreign.id}'})
+        self.assertEqual([item['id'] for item in response.data['object']], [str(application.id)])
+        self.assertEqual(response.data['missingIds'], [str(foreign.id)])
+
+    def test_invalid_ids_are_rejected(self):
+        self.assertEqual(self.client.get('/api/jobs/', {'ids': 'not-a-uuid'}).status_code, 400)
+        self.assertEqual(self.client.get('/api/jobs/', {'ids': ','}).status_code, 400)
+
+    def test_too_many_ids_are_rejected(self):
+        ids = ','.join(str(uuid.uuid4()) for _ in range(JobViewSet.max_batch_ids + 1))
+        self.assertEqual(self.client.get('/api/jobs/', {'ids': ids}).status_code, 400)
+
+
+class BatchTests(JobPlatformTestCase):
+    def setUp(self):
+        self.company = User.objects.create_user('company@example.com', 'Company', 'Passw0rd!', role='company')
+        self.job = Job.objects.create(title='Backend Engineer', description='A job description long enough.', created_by=self.company)
+        self.client.force_authenticate(self.company)
+
+    def batch(self, *requests):
+        return self.client.post('/api/batch/', {'requests': list(requests)}, format='json')
+
+    def test_runs_sub_requests_as_the_batch_user(self):
+        response = self.batch(
+            {'method': 'GET', 'path': f'/api/jobs/{self.job.id}/'},
+            {'method': 'PATCH', 'path': f'/api/jobs/{self.job.id}/', 'body': {'title': 'Platform Engineer'}},
+            {'method': 'GET', 'path': '/api/users/'},
+        )
+        self.assertEqual(response.status_code, 200)
+        results = response.data['object']
+        self.assertEqual([result['status'] for result in results], [200, 200, 200])
+        self.assertEqual(results[0]['body']['object']['title'], 'Backend Engineer')
+        self.assertEqual(results[2]['body']['results'][0]['email'], 'company@example.com')
+        self.job.refresh_from_db()
+        self.assertEqual(self.job.title, 'Platform Engineer')
+
+    def test_unknown_and_non_viewset_paths_are_not_found(self):
+        response = self.batch(
+            {'method': 'GET', 'path': '/api/nowhere/'},
+            {'method': 'POST', 'path': '/api/token/', 'body': {'email': 'company@example.com', 'password': 'Passw0rd!'}},
+            {'method': 'POST', 'path': '/api/batch/', 'body': {'requests': []}},
+            {'method': 'GET', 'path': '/admin/'},
+        )
+        self.assertEqual([result['status'] for result in response.data['object']], [404, 404, 404, 404])
+
+    def test_unsupported_method_is_reported_per_entry(self):
+        response = self.batch({'method': 'OPTIONS', 'path': '/api/jobs/'}, {'method': 'GET', 'path': '/api/jobs/'})
+        self.assertEqual([result['status'] for result in response.data['object']], [405, 200])
+
+    def test_failing_sub_request_does_not_fail_the_batch(self):
+        with mock.patch.object(JobViewSet, 'retrieve', side_effect=RuntimeError('boom')), self.assertLogs('jobs.views', 'ERROR'):
+            response = self.batch(
+                {'method': 'PATCH', 'path': f'/api/jobs/{self.job.id}/', 'body': {'title': 'Platform Engineer'}},
+                {'method': 'GET', 'path': f'/api/jobs/{self.job.id}/'},
+            )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([result['status'] for result in response.data['object']], [200, 500])
+
+    def test_only_post_is_advertised(self):
+        response = self.client.get('/api/batch/')
+        self.assertEqual(response.status_code, 405)
+        self.assertEqual(response['Allow'], 'POST, OPTIONS')
+
+    def test_requires_authentication(self):
+        self.client.force_authenticate(None)
+        self.assertEqual(self.batch({'method': 'GET', 'path': '/api/jobs/'}).status_code, 401)
+
+    def test_rejects_empty_batch(self):
+        self.assertEqual(self.batch().status_code, 400)
+
+
+@mock.patch.object(AutocompleteIndexes, 'sync_interval', 3600)
+class AutocompleteTests(JobPlatformTestCase):
+    def setUp(self):
+        self.company = User.objects.create_user('company@example.com', 'Company', 'Passw0rd!', role='company')
+        self.client.force_authenticate(self.company)
+        indexes.reset()
+        indexes.rebuild()
+
+    def create_job(self, title, location=''):
+        with self.captureOnCommitCallbacks(execute=True):
+            return Job.objects.create(title=title, description='A job description long enough.', location=location, created_by=self.company)
+
+    def suggest(self, q, field='title'):
+        response = self.client.get('/api/jobs/autocomplete/', {'q': q, 'field': field})
+        self.assertEqual(response.status_code, 200)
+        return [(item['value'], item['count']) for item in response.data['object']]
+
+    def test_warms_up_in_the_background(self):
+        indexes.reset()
+        with mock.patch('jobs.autocomplete.threading.Thread') as thread:
+            self.assertEqual(self.suggest('des'), [])
+        thread.return_value.start.assert_called_once_with()
+        indexes._maintenance_lock.release()
+
+    def test_ranks_normalized_values_by_posting_count(self):
+        for title in ['Product Manager', 'Python Developer', '  Python   Developer ', 'Data Analyst']:
+            self.create_job(title, location='Addis Ababa')
+        self.assertEqual(self.suggest('P'), [('Python Developer', 2), ('Product Manager', 1)])
+        self.assertEqual(self.suggest('addis', field='location'), [('Addis Ababa', 4)])
+
+    def test_index_follows_create_rename_and_delete(self):
+        job = self.create_job('Designer')
+        self.assertEqual(self.suggest('des'), [('Designer', 1)])
+        self.create_job('Data Engineer')
+        self.assertEqual(self.suggest('da'), [('Data Engineer', 1)])
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.patch(f'/api/jobs/{job.id}/', {'title': 'Product Designer'}, format='json')
+        self.assertEqual(self.suggest('des'), [])
+        self.assertEqual(self.suggest('product'), [('Product Designer', 1)])
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.delete(f'/api/jobs/{job.id}/')
+        self.assertEqual(self.suggest('product'), [])
+
+    def test_rolled_back_writes_leave_the_index_alone(self):
+        job = self.create_job('Designer')
+        with self.captureOnCommitCallbacks(execute=True):
+            with self.assertRaises(RuntimeError), transaction.atomic():
+                job.title = 'Architect'
+                job.save()
+                raise RuntimeError
+        indexes.sync()
+        self.assertEqual(self.suggest('des'), [('Designer', 1)])
+        self.assertEqual(self.suggest('arch'), [])
+
+    def test_sync_replays_writes_from_other_processes(self):
+        job = self.create_job('Designer')
+        # Without running the on-commit hook this worker only learns about the rename from the change log.
+        job.title = 'Architect'
+        job.save()
+        self.assertEqual(self.suggest('des'), [('Designer', 1)])
+        indexes.sync()
+        self.assertEqual(self.suggest('des'), [])
+        self.assertEqual(self.suggest('arch'), [('Architect', 1)])
+        indexes.sync()
+        self.assertEqual(self.suggest('arch'), [('Architect', 1)])
+
+    def test_logged_writes_do_not_trigger_a_rebuild(self):
+        job = self.create_job('Designer')
+        with self.captureOnCommitCallbacks(execute=True):
+            job.description = 'An updated job description long enough.'
+            job.save()
+        with mock.patch.object(AutocompleteIndexes, '_rebuild') as rebuild:
+            indexes._check_drift()
+        rebuild.assert_not_called()
+
+    def test_unlogged_writes_are_caught_as_drift(self):
+        self.create_job('Designer')
+        Job.objects.bulk_create([Job(title='Architect', description='A job description long enough.', created_by=self.company)])
+        indexes._check_drift()
+        self.assertEqual(self.suggest('arch'), [('Architect', 1)])
+
+    @mock.patch.object(PrefixIndex, 'max_scan', 2)
+    @mock.patch.object(PrefixIndex, 'cache_depth', 4)
+    @mock.patch.object(PrefixIndex, 'max_limit', 2)
+    def test_wide_prefix_cache_is_patched_in_place(self):
+        titles = ['Dev A'] * 4 + ['Dev B'] * 3 + ['Dev C'] * 2 + ['Dev D', 'Dev E', 'Dev F', 'Designer']
+        jobs = [self.create_job(title) for title in titles]
+        self.assertEqual(self.suggest('d'), [('Dev A', 4), ('Dev B', 3)])
+        index = indexes['title']
+        self.assertIn('d', index._wide_cache)
+        self.assertIn('dev ', index._wide_cache)
+        with self.captureOnCommitCallbacks(execute=True):
+            for job in jobs[:4]:
+                job.delete()
+        self.assertEqual(self.suggest('d'), [('Dev B', 3), ('Dev C', 2)])
+        with self.captureOnCommitCallbacks(execute=True):
+            for job in jobs[4:7]:
+                job.title = 'Designer'
+                job.save()
+        self.assertEqual(self.suggest('d'), [('Designer', 4), ('Dev C', 2)])
+        self.assertEqual(self.suggest('dev'), [('Dev C', 2), ('Dev D', 1)])
+
+    def test_requires_query_and_known_field(self):
+        self.assertEqual(self.client.get('/api/jobs/autocomplete/', {'q': ''}).status_code, 400)
+        self.assertEqual(self.client.get('/api/jobs/autocomplete/', {'q': 'a', 'field': 'description'}).status_code, 400)
+
+
+class ThrottleTests(JobPlatformTestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.store_path = os.path.join(directory.name, 'throttle.sqlite3')
+        rates = {'company': '100/min', 'company.job.list': '3/min'}
+        override = self.settings(
+            THROTTLE_STORE_PATH=self.store_path,
+            REST_FRAMEWORK={**settings.REST_FRAMEWORK, 'DEFAULT_THROTTLE_RATES': rates},
+        )
+        override.enable()
+        self.addCleanup(override.disable)
+        TokenBucketThrottle.local_buckets.clear()
+        TokenBucketThrottle.hits.clear()
+        TokenBucketThrottle.next_report = 0
+        self.company = User.objects.create_user('company@example.com', 'Company', 'Passw0rd!', role='company')
+        self.client.force_authenticate(self.company)
+
+    def test_denies_past_the_rate_with_retry_after(self):
+        self.assertEqual([self.client.get('/api/jobs/').status_code for _ in range(3)], [200, 200, 200])
+        response = self.client.get('/api/jobs/')
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response['Retry-After'], '20')
+        self.assertEqual(self.client.get('/api/jobs/autocomplete/', {'q': 'a'}).status_code, 200)
+
+    def test_buckets_are_per_user(self):
+        for _ in range(4):
+            self.client.get('/api/jobs/')
+        other = User.objects.create_user('other@example.com', 'Other', 'Passw0rd!', role='company')
+        self.client.force_authenticate(other)
+        self.assertEqual(self.client.get('/api/jobs/').status_code, 200)
+
+    def test_limits_hold_across_processes(self):
+        for _ in range(3):
+            self.client.get('/api/jobs/')
+        TokenBucketThrottle.local_buckets.clear()
+        TokenBucketThrottle.store = SharedBucketStore(self.store_path)
+        self.assertEqual(self.client.get('/api/jobs/').status_code, 429)
+
+    def throttle_stats(self):
+        out = io.StringIO()
+        call_command('throttle_stats', stdout=out)
+        return out.getvalue()
+
+    def test_hits_are_flushed_when_the_report_is_due(self):
+        for _ in range(5):
+            self.client.get('/api/jobs/')
+        self.assertIn('No throttled requests', self.throttle_stats())
+        TokenBucketThrottle.next_report = 0
+        self.client.get('/api/users/')
+        self.assertIn('company.job.list\t2', self.throttle_stats())
+
+    def test_pending_hits_are_flushed_on_exit(self):
+        for _ in range(6):
+            self.client.get('/api/jobs/')
+        TokenBucketThrottle.flush_hits()
+        self.assertIn('company.job.list\t3', self.throttle_stats())
+        self.assertEqual(TokenBucketThrottle.hits, {})
+
+    def test_local_buckets_are_capped(self):
+        throttle = TokenBucketThrottle()
+        with mock.patch.object(TokenBucketThrottle, 'max_local_buckets', 2):
+            for key in ['a', 'b', 'c']:
+                throttle.remember(key, 1, 60, denied=False)
+        self.assertEqual(list(TokenBucketThrottle.local_buckets), ['b', 'c'])
+
+    def test_refilled_buckets_are_swept(self):
+        store = SharedBucketStore(self.store_path)
+        now = time.time()
+        store.lease('old', 10, 1, 1, now - 100)
+        store.lease('new', 10, 1, 1, now)
+        rows = store._connection().execute('SELECT key FROM buckets').fetchall()
+        self.assertEqual(rows, [('new',)])
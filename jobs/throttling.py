@@ -0,0 +1,202 @@
+import atexit
+import logging
+import sqlite3
+import threading
+import time
+from collections import Counter, OrderedDict
+from django.conf import settings
+from rest_framework.settings import api_settings
+from rest_framework.throttling import BaseThrottle
+
+logger = logging.getLogger(__name__)
+
+PERIODS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
+
+def parse_rate(rate):
+    num, period = rate.split('/')
+    return int(num), PERIODS[period[0]]
+
+
+class SharedBucketStore:
+    """
+    Token buckets kept in a local SQLite file so every worker process draws from the same counters.
+
+    Writers wait at most `busy_timeout` seconds for the file lock; past that the lease raises
+    sqlite3.OperationalError and the throttle lets the request through.
+    """
+    busy_timeout = 0.05
+    sweep_interval = 60
+
+    def __init__(self, path):
+        self.path = str(path)
+        self._local = threading.local()
+        self._next_sweep = 0
+
+    def _connection(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=self.busy_timeout, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            # WAL with synchronous=NORMAL skips the fsync per commit; a crash can only lose recent leases.
+            conn.execute('PRAGMA synchronous=NORMAL')
+            conn.execute('CREATE TABLE IF NOT EXISTS buckets (key TEXT PRIMARY KEY, tokens REAL, updated REAL, full_at REAL)')
+            conn.execute('CREATE INDEX IF NOT EXISTS buckets_full_at ON buckets (full_at)')
+            conn.execute('CREATE TABLE IF NOT EXISTS hits (scope TEXT PRIMARY KEY, total INTEGER)')
+            self._local.conn = conn
+        return conn
+
+    def lease(self, key, capacity, rate, wanted, now):
+        """Take up to `wanted` tokens; returns (granted, tokens left in the shared bucket)."""
+        conn = self._connection()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            row = conn.execute('SELECT tokens, updated FROM buckets WHERE key = ?', (key,)).fetchone()
+            tokens = capacity if row is None else min(capacity, row[0] + (now - row[1]) * rate)
+            granted = min(wanted, int(tokens))
+            tokens -= granted
+            conn.execute(
+                'INSERT OR REPLACE INTO buckets (key, tokens, updated, full_at) VALUES (?, ?, ?, ?)',
+                (key, tokens, now, now + (capacity - tokens) / rate),
+            )
+            if now >= self._next_sweep:
+                # A missing row reads as a full bucket, so rows that have refilled can go.
+                self._next_sweep = now + self.sweep_interval
+                conn.execute('DELETE FROM buckets WHERE full_at <= ?', (now,))
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+        return granted, tokens
+
+    def record_hits(self, counts):
+        conn = self._connection()
+        conn.executemany(
+            'INSERT INTO hits (scope, total) VALUES (?, ?) ON CONFLICT (scope) DO UPDATE SET total = total + excluded.total',
+            counts.items(),
+        )
+
+    def hit_totals(self):
+        return dict(self._connection().execute('SELECT scope, total FROM hits ORDER BY total DESC'))
+
+
+def get_store():
+    if TokenBucketThrottle.store is None or TokenBucketThrottle.store.path != str(settings.THROTTLE_STORE_PATH):
+        TokenBucketThrottle.store = SharedBucketStore(settings.THROTTLE_STORE_PATH)
+    return TokenBucketThrottle.store
+
+
+class TokenBucketThrottle(BaseThrottle):
+    """
+    Per-user, per-role token bucket for each view action.
+
+    Rates come from DEFAULT_THROTTLE_RATES, looked up as `<role>.<basename>.<action>` and then `<role>`,
+    where role is the user's role or `anon`. Each process leases a slice of tokens from the shared store
+    and spends them from memory, so most decisions never leave the process. Hits are counted per scope
+    and flushed to the store, with one aggregated log line, every `report_interval` seconds and when the
+    process exits.
+    """
+    store = None
+    max_local_buckets = 10000
+    report_interval = 60
+    local_buckets = OrderedDict()
+    hits = Counter()
+    next_report = 0
+    lock = threading.Lock()
+
+    def __init__(self):
+        self.wait_seconds = None
+        self.store = get_store()
+
+    def get_scope(self, request, view):
+        role = getattr(request.user, 'role', None) if request.user and request.user.is_authenticated else 'anon'
+        basename = getattr(view, 'basename', None) or view.__class__.__name__.lower()
+        action = getattr(view, 'action', None) or request.method.lower()
+        return role, f'{role}.{basename}.{action}'
+
+    def get_rate(self, role, scope):
+        rates = api_settings.DEFAULT_THROTTLE_RATES
+        return rates.get(scope) or rates.get(role)
+
+    def allow_request(self, request, view):
+        self.report_if_due()
+        role, scope = self.get_scope(request, view)
+        rate = self.get_rate(role, scope)
+        if rate is None:
+            return True
+        ident = request.user.pk if request.user and request.user.is_authenticated else self.get_ident(request)
+        key = f'{scope}:{ident}'
+        now = time.monotonic()
+        with self.lock:
+            bucket = self.local_buckets.get(key)
+            if bucket is not None and now < bucket[1]:
+                self.local_buckets.move_to_end(key)
+                if bucket[0] >= 1:
+                    bucket[0] -= 1
+                    return True
+                if bucket[2]:
+                    return self.deny(scope, bucket[1] - now)
+        return self.refill(key, scope, rate)
+
+    def refill(self, key, scope, rate):
+        capacity, period = parse_rate(rate)
+        per_second = capacity / period
+        lease_size = max(1, capacity // 10)
+        try:
+            granted, remaining = self.store.lease(key, capacity, per_second, lease_size, time.time())
+        except sqlite3.Error:
+            logger.warning('Throttle store unavailable, allowing request for %s', scope, exc_info=True)
+            return True
+        if granted:
+            # Unspent leased tokens expire once the shared bucket would have refilled them.
+            self.remember(key, granted - 1, max(1.0, lease_size / per_second), denied=False)
+            return True
+        # Denials are remembered until a token is due, so a client hammering the API never reaches the store.
+        wait = (1 - remaining) / per_second
+        self.remember(key, 0, wait, denied=True)
+        with self.lock:
+            return self.deny(scope, wait)
+
+    def remember(self, key, tokens, ttl, denied):
+        with self.lock:
+            self.local_buckets[key] = [tokens, time.monotonic() + ttl, denied]
+            self.local_buckets.move_to_end(key)
+            if len(self.local_buckets) > self.max_local_buckets:
+                self.local_buckets.popitem(last=False)
+
+    def deny(self, scope, wait):
+        """Count a hit; called with `lock` held."""
+        self.hits[scope] += 1
+        self.wait_seconds = wait
+        return False
+
+    @classmethod
+    def report_if_due(cls):
+        now = time.monotonic()
+        if now < cls.next_report:
+            return
+        with cls.lock:
+            if now < cls.next_report:
+                return
+            cls.next_report = now + cls.report_interval
+        cls.flush_hits()
+
+    @classmethod
+    def flush_hits(cls):
+        # Counts are taken under the lock, but the store write happens after it is released.
+        with cls.lock:
+            counts = dict(cls.hits)
+            cls.hits.clear()
+        if not counts:
+            return
+        logger.info('Throttled requests since last report: %s', ', '.join(f'{scope}={n}' for scope, n in counts.items()))
+        try:
+            get_store().record_hits(counts)
+        except sqlite3.Error:
+            logger.warning('Could not record throttle hits', exc_info=True)
+
+    def wait(self):
+        return self.wait_seconds
+
+
+atexit.register(TokenBucketThrottle.flush_hits)
@@ -1,6 +1,6 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import UserViewSet, JobViewSet, ApplicationViewSet
+from .views import UserViewSet, JobViewSet, ApplicationViewSet, BatchView
 
 router = DefaultRouter()
 router.register(r'users', UserViewSet, basename='user')
@@ -8,5 +8,6 @@ router.register(r'jobs', JobViewSet, basename='job')
 router.register(r'applications', ApplicationViewSet, basename='application')
 
 urlpatterns = [
+    path('batch/', BatchView.as_view(), name='batch'),
     path('', include(router.urls)),
 ]
\ No newline at end of file
@@ -1,10 +1,54 @@
+import io
+import json
+import logging
+import uuid
+from urllib.parse import urlsplit
+from django.http import HttpRequest, QueryDict
+from django.urls import resolve, Resolver404
 from rest_framework import viewsets, status, permissions
 from rest_framework.response import Response
 from rest_framework.decorators import action
+from rest_framework.views import APIView
 from django_filters.rest_framework import DjangoFilterBackend
 from .models import User, Job, Application
 from .serializers import UserSerializer, JobSerializer, ApplicationSerializer
 from .permissions import IsCompany, IsApplicant, IsJobOwner, IsApplicationJobOwner
+from .autocomplete import indexes as autocomplete_indexes
+
+logger = logging.getLogger(__name__)
+
+class MultiGetMixin:
+    """Resolve `?ids=a,b,c` on list endpoints with a single query."""
+    max_batch_ids = 50
+
+    def multi_get(self, request, queryset, label):
+        raw_ids = [value.strip() for value in request.query_params.get('ids', '').split(',') if value.strip()]
+        if not raw_ids or len(raw_ids) > self.max_batch_ids:
+            return Response({
+                'success': False,
+                'message': f'Provide between 1 and {self.max_batch_ids} ids',
+                'object': None,
+                'errors': ['Invalid ids']
+            }, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            ids = list(dict.fromkeys(str(uuid.UUID(value)) for value in raw_ids))
+        except ValueError:
+            return Response({
+                'success': False,
+                'message': 'Ids must be valid UUIDs',
+                'object': None,
+                'errors': ['Invalid ids']
+            }, status=status.HTTP_400_BAD_REQUEST)
+        found = {str(obj.pk): obj for obj in queryset.filter(pk__in=ids)}
+        serializer = self.get_serializer([found[pk] for pk in ids if pk in found], many=True)
+        return Response({
+            'success': True,
+            'message': f'{label} retrieved successfully',
+            'object': serializer.data,
+            'missingIds': [pk for pk in ids if pk not in found],
+            'errors': None
+        })
+
 class UserViewSet(viewsets.ModelViewSet):
     queryset = User.objects.all()
     serializer_class = UserSerializer
@@ -34,7 +78,7 @@ class UserViewSet(viewsets.ModelViewSet):
                 'errors': [str(e)]
             }, status=status.HTTP_400_BAD_REQUEST)
 
-class JobViewSet(viewsets.ModelViewSet):
+class JobViewSet(MultiGetMixin, viewsets.ModelViewSet):
     queryset = Job.objects.all()
     serializer_class = JobSerializer
     filter_backends = [DjangoFilterBackend]
@@ -93,6 +137,8 @@ class JobViewSet(viewsets.ModelViewSet):
         if request.user.role == 'company':
             self.queryset = Job.objects.filter(created_by=request.user)
         queryset = self.filter_queryset(self.get_queryset())
+        if 'ids' in request.query_params:
+            return self.multi_get(request, queryset, 'Jobs')
         page = self.paginate_queryset(queryset)
         if page is not None:
             serializer = self.get_serializer(page, many=True)
@@ -130,7 +176,29 @@ class JobViewSet(viewsets.ModelViewSet):
                 'object': None,
                 'errors': ['Job not found']
             }, status=status.HTTP_404_NOT_FOUND)
-class ApplicationViewSet(viewsets.ModelViewSet):
+
+    @action(detail=False, methods=['get'], url_path='autocomplete')
+    def autocomplete(self, request):
+        field = request.query_params.get('field', 'title')
+        prefix = request.query_params.get('q', '').strip()
+        try:
+            limit = max(1, int(request.query_params.get('limit', 10)))
+        except ValueError:
+            limit = 10
+        if field not in autocomplete_indexes or not prefix:
+            return Response({
+                'success': False,
+                'message': 'Provide q and a field of title or location',
+                'object': None,
+                'errors': ['Invalid autocomplete query']
+            }, status=status.HTTP_400_BAD_REQUEST)
+        return Response({
+            'success': True,
+            'message': 'Suggestions retrieved successfully',
+            'object': autocomplete_indexes.suggest(field, prefix, limit),
+            'errors': None
+        })
+class ApplicationViewSet(MultiGetMixin, viewsets.ModelViewSet):
     queryset = Application.objects.all()
     serializer_class = ApplicationSerializer
 
@@ -170,6 +238,8 @@ class ApplicationViewSet(viewsets.ModelViewSet):
 
     def list(self, request, *args, **kwargs):
         queryset = self.filter_queryset(self.get_queryset())
+        if 'ids' in request.query_params:
+            return self.multi_get(request, queryset, 'Applications')
         page = self.paginate_queryset(queryset)
         if page is not None:
             serializer = self.get_serializer(page, many=True)
@@ -266,4 +336,66 @@ class ApplicationViewSet(viewsets.ModelViewSet):
             'message': 'Application status updated',
             'object': serializer.data,
             'errors': None
-        })
\ No newline at end of file
+        })
+
+class BatchView(APIView):
+    """Run several API sub-requests under a single authentication pass."""
+    max_batch_requests = 20
+    sub_request_methods = ['GET', 'POST', 'PUT', 'PATCH', 'DELETE']
+
+    def post(self, request):
+        sub_requests = request.data.get('requests') if isinstance(request.data, dict) else None
+        if not isinstance(sub_requests, list) or not 1 <= len(sub_requests) <= self.max_batch_requests:
+            return Response({
+                'success': False,
+                'message': f'Provide between 1 and {self.max_batch_requests} requests',
+                'object': None,
+                'errors': ['Invalid batch']
+            }, status=status.HTTP_400_BAD_REQUEST)
+        results = [self.dispatch_sub_request(request, sub_request) for sub_request in sub_requests]
+        return Response({
+            'success': True,
+            'message': 'Batch processed successfully',
+            'object': results,
+            'errors': None
+        })
+
+    def dispatch_sub_request(self, request, sub_request):
+        if not isinstance(sub_request, dict):
+            return {'status': status.HTTP_400_BAD_REQUEST, 'body': None, 'errors': ['Invalid sub-request']}
+        method = str(sub_request.get('method', 'GET')).upper()
+        url = urlsplit(str(sub_request.get('path', '')))
+        if method not in self.sub_request_methods:
+            return {'status': status.HTTP_405_METHOD_NOT_ALLOWED, 'body': None, 'errors': ['Method not allowed']}
+        try:
+            match = resolve(url.path)
+        except Resolver404:
+            match = None
+        # Only the routers' viewsets are reachable; token and other plain views stay outside a batch.
+        view_class = getattr(match.func, 'cls', None) if match else None
+        if view_class is None or not url.path.startswith('/api/') or not issubclass(view_class, viewsets.ViewSetMixin):
+            return {'status': status.HTTP_404_NOT_FOUND, 'body': None, 'errors': ['Path not found']}
+        try:
+            response = match.func(self.build_sub_request(request, method, url, sub_request.get('body')), *match.args, **match.kwargs)
+        except Exception:
+            # Earlier sub-requests may already have written, so one failure must not discard the whole batch.
+            logger.exception('Batch sub-request %s %s failed', method, url.path)
+            return {'status': status.HTTP_500_INTERNAL_SERVER_ERROR, 'body': None, 'errors': ['Internal server error']}
+        return {'status': response.status_code, 'body': getattr(response, 'data', None), 'errors': None}
+
+    def build_sub_request(self, request, method, url, body):
+        sub = HttpRequest()
+        sub.method = method
+        sub.path = sub.path_info = url.path
+        sub.META = {key: value for key, value in request.META.items() if not key.startswith(('CONTENT_', 'HTTP_CONTENT_'))}
+        sub.META.update({'REQUEST_METHOD': method, 'PATH_INFO': url.path, 'QUERY_STRING': url.query})
+        sub.GET = QueryDict(url.query)
+        payload = json.dumps(body).encode() if body is not None else b''
+        sub.META['CONTENT_TYPE'] = 'application/json'
+        sub.META['CONTENT_LENGTH'] = str(len(payload))
+        sub._stream = io.BytesIO(payload)
+        sub._read_started = False
+        # The parent request is already authenticated; DRF honours a forced user so the sub-view skips JWT decoding.
+        sub._force_auth_user = request.user
+        sub._force_auth_token = request.auth
+        return sub